@@ -0,0 +1,210 @@
+#Measures how accurately TimerGame.play_round (game_countdown.py) records the moment ENTER was pressed.
+#The game runs in a pseudo-terminal and this script types ENTER at exactly planned moments,
+#then compares the time the game recorded with the real time between the two keypresses.
+#Also records CPU time and terminal output per round. Linux/macOS only (needs pty).
+#
+#Run:      python bench_timing.py
+#Compare:  python bench_timing.py --compare old_results.json
+
+import argparse
+import json
+import os
+import pty
+import select
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROUND_MARKER = b"@@ROUND "
+START_PROMPT = b"Press ENTER to START"
+
+
+def run_child(frame_interval, input_wait, rounds):
+    """Runs inside the pseudo-terminal: plays rounds and reports each one"""
+    from game_countdown import TimerGame
+    game = TimerGame()
+    game.frame_interval = frame_interval
+    game.input_wait = input_wait
+    for _ in range(rounds):
+        cpu_before = time.process_time()
+        game.play_round()
+        cpu = time.process_time() - cpu_before
+        print("\n" + ROUND_MARKER.decode() + json.dumps({'elapsed': game.elapsed, 'cpu': cpu}), flush=True)
+
+
+class PtyGame:
+    def __init__(self, frame_interval, input_wait, rounds):
+        # The game creates leaderboard.txt in its working folder, so give it a throwaway one
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.pid, self.fd = pty.fork()
+        if self.pid == 0:
+            os.chdir(self.work_dir.name)
+            os.environ.pop("COUNTDOWN_SERVER", None)  # Don't send benchmark scores anywhere
+            os.execv(sys.executable, [sys.executable, os.path.abspath(__file__), "--child",
+                                      str(frame_interval), input_wait, str(rounds)])
+        self.buffer = b""
+        self.bytes_read = 0
+
+    def read_until(self, deadline):
+        """Keep draining the game's output until the deadline (so it never blocks on a full pty)"""
+        while True:
+            remaining = deadline - time.perf_counter()
+            # Leave the last millisecond for spinning so the keypress lands on time
+            if remaining <= 0.001:
+                break
+            ready, _, _ = select.select([self.fd], [], [], remaining - 0.001)
+            if ready:
+                self._read()
+        while time.perf_counter() < deadline:
+            pass
+
+    def wait_for(self, text, timeout=10.0):
+        """Read output until `text` shows up and return everything after it"""
+        deadline = time.perf_counter() + timeout
+        while text not in self.buffer:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"Game never printed {text!r}")
+            ready, _, _ = select.select([self.fd], [], [], 0.1)
+            if ready:
+                self._read()
+        before, _, after = self.buffer.partition(text)
+        self.buffer = after
+        return before
+
+    def _read(self):
+        try:
+            data = os.read(self.fd, 65536)
+        except OSError:
+            data = b""
+        if not data:
+            raise EOFError("Game process exited")
+        self.buffer += data
+        self.bytes_read += len(data)
+
+    def press_enter(self):
+        os.write(self.fd, b"\n")
+        return time.perf_counter()
+
+    def close(self):
+        os.close(self.fd)
+        os.waitpid(self.pid, 0)
+        self.work_dir.cleanup()
+
+
+def bench_config(frame_interval, input_wait, delays):
+    """Play one round per delay and collect recorded-minus-true times"""
+    game = PtyGame(frame_interval, input_wait, len(delays))
+    rounds = []
+    try:
+        for delay in delays:
+            game.wait_for(START_PROMPT)
+            game.read_until(time.perf_counter() + 0.05)  # Let the prompt settle before starting
+            bytes_before = game.bytes_read - len(game.buffer)
+            start = game.press_enter()
+            game.read_until(start + delay)
+            stop = game.press_enter()
+            game.wait_for(ROUND_MARKER)
+            report = json.loads(game.wait_for(b"\n").strip())
+            rounds.append({
+                'delay': delay,
+                'true_elapsed': stop - start,
+                'recorded_elapsed': report['elapsed'],
+                'error_ms': (report['elapsed'] - (stop - start)) * 1000,
+                'cpu_s': report['cpu'],
+                'bytes': game.bytes_read - len(game.buffer) - bytes_before
+            })
+    finally:
+        game.close()
+    return rounds
+
+
+def summarize(rounds):
+    errors = sorted(r['error_ms'] for r in rounds)
+    true_total = sum(r['true_elapsed'] for r in rounds)
+    return {
+        'rounds': len(rounds),
+        'error_ms_min': errors[0],
+        'error_ms_median': statistics.median(errors),
+        'error_ms_p90': errors[min(len(errors) - 1, int(len(errors) * 0.9))],
+        'error_ms_max': errors[-1],
+        'error_ms_stdev': statistics.stdev(errors) if len(errors) > 1 else 0.0,
+        'cpu_percent': 100 * sum(r['cpu_s'] for r in rounds) / true_total,
+        'bytes_per_round': sum(r['bytes'] for r in rounds) / len(rounds)
+    }
+
+
+def print_table(results, baseline=None):
+    print(f"{'fps':>5} | {'wait':<5} | {'median ms':>9} | {'p90 ms':>7} | {'max ms':>7} | {'stdev':>6} | {'cpu %':>6} | {'bytes/rnd':>9}")
+    print("-" * 78)
+    for key, summary in results.items():
+        fps, wait = key.split("/")
+        line = (f"{fps:>5} | {wait:<5} | {summary['error_ms_median']:>9.2f} | {summary['error_ms_p90']:>7.2f} | "
+                f"{summary['error_ms_max']:>7.2f} | {summary['error_ms_stdev']:>6.2f} | {summary['cpu_percent']:>6.1f} | "
+                f"{summary['bytes_per_round']:>9.0f}")
+        if baseline and key in baseline:
+            old = baseline[key]
+            line += (f"   (was {old['error_ms_median']:.2f} ms, {old['cpu_percent']:.1f} %, "
+                     f"{old['bytes_per_round']:.0f} B)")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timing accuracy benchmark for game_countdown.py")
+    parser.add_argument("--fps", default="20,60", help="Comma separated redraw rates (20 = the game's default)")
+    parser.add_argument("--wait", default="poll,block", help="Comma separated input strategies: poll, block")
+    parser.add_argument("--delays", default="0.5,0.75,1.0,1.25,1.5", help="Seconds between START and STOP presses")
+    parser.add_argument("--repeat", type=int, default=2, help="How many times to play each delay")
+    parser.add_argument("--output", default="timing_results.json", help="Where to save the results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    # Load the baseline first so a bad path fails before the long run, not after it
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, 'r') as f:
+                baseline = json.load(f)['summary']
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"can't read results to compare against from {args.compare}: {e}")
+
+    delays = [float(d) for d in args.delays.split(",")] * args.repeat
+    results = {}
+    raw = {}
+    for fps in args.fps.split(","):
+        for wait in args.wait.split(","):
+            key = f"{fps}/{wait}"
+            print(f"Running {fps} fps with '{wait}' input...")
+            rounds = bench_config(1.0 / float(fps), wait, delays)
+            raw[key] = rounds
+            results[key] = summarize(rounds)
+
+    print()
+    print_table(results, baseline)
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': sys.version.split()[0],
+            'commit': _git_commit(),
+            'summary': results,
+            'rounds': raw
+        }, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        run_child(float(sys.argv[2]), sys.argv[3], int(sys.argv[4]))
+    else:
+        main()
@@ -16,6 +16,15 @@ try:
 except ImportError:
     COLORS_ENABLED = False
 
+# Optional: send scores to the web version as well (see score_sync.py).
+# Set COUNTDOWN_SERVER to the Flask URL, e.g. http://127.0.0.1:5000
+try:
+    from score_sync import ScoreSync
+    SYNC_ENABLED = True
+except ImportError:
+    SYNC_ENABLED = False
+SERVER_URL = os.environ.get("COUNTDOWN_SERVER")
+
 
 class TimerGame:
     def __init__(self):
@@ -25,8 +34,13 @@ class TimerGame:
         self.mode = "hidden"  # "hidden" or "visible"
         self.difficulty = "medium"  # "easy", "medium", "hard"
         self.player = None  # Will be set during registration
+        self.frame_interval = 0.05  # Seconds between timer redraws
+        self.input_wait = "poll"  # "poll" checks for ENTER without waiting, "block" waits for ENTER until the next redraw
         self.leaderboard_file = "leaderboard.txt"
         self.ensure_leaderboard_file()
+        self.sync = ScoreSync(SERVER_URL) if SERVER_URL and SYNC_ENABLED else None
+        if self.sync:
+            self.sync.flush_in_background()  # Send scores left over from last time
         
     def ensure_leaderboard_file(self):
         """Create leaderboard file if it doesn't exist"""
@@ -59,6 +73,10 @@ class TimerGame:
         # Add to leaderboard
         with open(self.leaderboard_file, 'a') as f:
             f.write(entry)
+        
+        # Send to the web leaderboard (queued locally if the server is down)
+        if self.sync:
+            self.sync.submit(self.player, score, self.difficulty, self.mode, timestamp)
     
     def get_leaderboard(self):
         """Retrieve and sort leaderboard entries"""
@@ -244,8 +262,8 @@ class TimerGame:
             current_time = time.time()
             self.elapsed = current_time - self.start_time
             
-            # Update display every 0.05 seconds for smooth animation
-            if current_time - last_update >= 0.05:
+            # Update display every frame_interval seconds for smooth animation
+            if current_time - last_update >= self.frame_interval:
                 self.clear_screen()
                 self.print_header()
                 self.display_target()
@@ -254,9 +272,13 @@ class TimerGame:
                 print("\nTIMER RUNNING... Press ENTER to STOP!")
                 last_update = current_time
             
-            # Check for key press without blocking
+            # Check for key press, waiting at most until the next redraw in "block" mode
+            if self.input_wait == "block":
+                wait = max(0, last_update + self.frame_interval - time.time())
+            else:
+                wait = 0
             try:
-                if sys.stdin in select.select([sys.stdin], [], [], 0)[0]:
+                if sys.stdin in select.select([sys.stdin], [], [], wait)[0]:
                     line = sys.stdin.readline()
                     if line:
                         break
@@ -360,6 +382,8 @@ class TimerGame:
                 print("\nPress ENTER to continue...")
                 input()
             elif choice == "4":
+                if self.sync:
+                    self.sync.close()  # Anything not sent yet stays queued for next time
                 print("\nThanks for playing!")
                 break
             else:
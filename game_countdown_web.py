@@ -2,23 +2,53 @@
 #This game will be hosted by browser using Flask. Do download flask first if you do not have it installed in your computer
 #The launching game is the same as the previous version, use "python" an proceed with the path of where you put the source code at then open the browser url provided by flask in your terminal.
 
-from flask import Flask, render_template_string, request, redirect, url_for, session
+from flask import Flask, render_template_string, request, redirect, url_for, session, jsonify, Response
 import random
+import math
 import time
 import json
 import os
+import hashlib
+import heapq
+import socket
+import csv
+import io
+import tempfile
+import threading
+from collections import OrderedDict
 from datetime import datetime
 
+# Optional: score statistics and export (see score_analytics.py)
+try:
+    from score_analytics import ScoreAnalytics, iter_leaderboard, NUMPY_ENABLED
+    ANALYTICS_ENABLED = True
+except ImportError:
+    ANALYTICS_ENABLED = False
+    NUMPY_ENABLED = False
+
 app = Flask(__name__)
 app.secret_key = 'countdown_secret_key'
-LEADERBOARD_FILE = 'leaderboard.json'
-SETTINGS_FILE = 'settings.json'
+LEADERBOARD_FILE = os.environ.get('COUNTDOWN_LEADERBOARD', 'leaderboard.json')
+NODE_ID = os.environ.get('COUNTDOWN_NODE_ID', socket.gethostname())
+SUMMARY_MAX_K = 1000
+VALID_MODES = ('hidden', 'visible')
+VALID_DIFFICULTIES = ('easy', 'medium', 'hard')
+SETTINGS_FILE = 'settings.json'  # Old single-file store, migrated into SETTINGS_DIR on first use
+SETTINGS_DIR = 'settings'
+SETTINGS_CACHE_SIZE = 256
 GLOBAL_SETTINGS_FILE = 'global_settings.json'
 
+# Saves read, change and rewrite the whole leaderboard, so they hold this
+# lock, and the new file is swapped in with os.replace so readers (and
+# streaming exports) always see either the old file or the new one.
+_leaderboard_lock = threading.Lock()
+
 def ensure_leaderboard_file():
-    if not os.path.exists(LEADERBOARD_FILE):
-        with open(LEADERBOARD_FILE, 'w') as f:
+    try:
+        with open(LEADERBOARD_FILE, 'x') as f:
             json.dump([], f)
+    except FileExistsError:
+        pass
 
 def get_leaderboard():
     ensure_leaderboard_file()
@@ -30,8 +60,23 @@ def get_leaderboard():
     leaderboard.sort(key=lambda x: x['score'])
     return leaderboard
 
-def save_to_leaderboard(player, score, difficulty, mode):
+def _load_leaderboard_for_update():
+    # Unlike get_leaderboard(), a broken file raises instead of reading as [],
+    # so a save never overwrites the leaderboard with just the new scores
     ensure_leaderboard_file()
+    with open(LEADERBOARD_FILE, 'r') as f:
+        leaderboard = json.load(f)
+    leaderboard.sort(key=lambda x: x['score'])
+    return leaderboard
+
+def _write_leaderboard(leaderboard):
+    folder = os.path.dirname(os.path.abspath(LEADERBOARD_FILE))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(leaderboard, f, indent=2)
+    os.replace(tmp_path, LEADERBOARD_FILE)
+
+def save_to_leaderboard(player, score, difficulty, mode):
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
     entry = {
         'player': player,
@@ -40,10 +85,62 @@ def save_to_leaderboard(player, score, difficulty, mode):
         'mode': mode,
         'date': timestamp
     }
-    leaderboard = get_leaderboard()
-    leaderboard.append(entry)
-    with open(LEADERBOARD_FILE, 'w') as f:
-        json.dump(leaderboard, f, indent=2)
+    with _leaderboard_lock:
+        leaderboard = _load_leaderboard_for_update()
+        leaderboard.append(entry)
+        _write_leaderboard(leaderboard)
+
+def save_many_to_leaderboard(entries):
+    # Add a batch of scores with a single rewrite of the file.
+    # Entries that carry an 'id' already in the leaderboard are skipped, so a
+    # client can safely resend a batch it never got an answer for.
+    with _leaderboard_lock:
+        leaderboard = _load_leaderboard_for_update()
+        seen_ids = {entry['id'] for entry in leaderboard if 'id' in entry}
+        added = 0
+        for entry in entries:
+            if entry.get('id') and entry['id'] in seen_ids:
+                continue
+            if entry.get('id'):
+                seen_ids.add(entry['id'])
+            leaderboard.append(entry)
+            added += 1
+        if added:
+            _write_leaderboard(leaderboard)
+    return added
+
+# Summary of this node's leaderboard for leaderboard_aggregator.py.
+# The version combines the run count with the file's mtime and size, so a
+# leaderboard that was reset or rewritten never looks like an older one of
+# the same length. The summary is cached until the file changes and is
+# replaced as a whole, so request threads never see half of an update.
+_summary_cache = {'key': None}
+
+def get_summary():
+    global _summary_cache
+    ensure_leaderboard_file()
+    stat = os.stat(LEADERBOARD_FILE)
+    key = (stat.st_mtime_ns, stat.st_size)
+    summary = _summary_cache
+    if summary['key'] != key:
+        with open(LEADERBOARD_FILE, 'r') as f:
+            try:
+                leaderboard = json.load(f)
+            except json.JSONDecodeError:
+                leaderboard = []
+        runs_by_mode = {}
+        for entry in leaderboard:
+            mode = entry.get('mode') or 'unknown'
+            runs_by_mode[mode] = runs_by_mode.get(mode, 0) + 1
+        summary = {
+            'key': key,
+            'version': f"{len(leaderboard)}-{stat.st_mtime_ns}-{stat.st_size}",
+            'runs': len(leaderboard),
+            'runs_by_mode': runs_by_mode,
+            'top': heapq.nsmallest(SUMMARY_MAX_K, leaderboard, key=lambda x: x['score'])
+        }
+        _summary_cache = summary
+    return summary
 
 def get_difficulty_range(difficulty):
     if difficulty == 'easy':
@@ -53,28 +150,94 @@ def get_difficulty_range(difficulty):
     else:
         return (1, 20)
 
+# Per-player settings are stored one file per player, sharded into
+# subfolders by the first two hex chars of the hashed name, e.g.
+# settings/3f/3fa2...c1.json. Reading or writing one player never touches
+# anyone else's file, and recently used players are kept in a small LRU cache.
+# The lock guards the cache and the one-time migration between request threads.
+_settings_cache = OrderedDict()
+_settings_lock = threading.Lock()
+_settings_migrated = False
+
+def _settings_path(player):
+    key = hashlib.sha1(player.encode('utf-8')).hexdigest()
+    return os.path.join(SETTINGS_DIR, key[:2], key + '.json')
+
+def _cache_settings(player, settings):
+    with _settings_lock:
+        _settings_cache[player] = settings
+        _settings_cache.move_to_end(player)
+        if len(_settings_cache) > SETTINGS_CACHE_SIZE:
+            _settings_cache.popitem(last=False)
+
+def _write_settings_file(player, settings):
+    path = _settings_path(player)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a uniquely named temp file and swap it in, so a reader never
+    # sees half a file and two saves for the same player don't collide
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'player': player, 'settings': settings}, f, indent=2)
+    os.replace(tmp_path, path)
+
+def migrate_settings():
+    # Move the old settings.json into the sharded store (runs once per process)
+    global _settings_migrated
+    if _settings_migrated:
+        return
+    with _settings_lock:
+        if _settings_migrated:
+            return
+        try:
+            with open(SETTINGS_FILE, 'r') as f:
+                try:
+                    all_settings = json.load(f)
+                except json.JSONDecodeError:
+                    all_settings = {}
+        except FileNotFoundError:
+            all_settings = None  # Nothing to migrate, or another process already did it
+        if all_settings is not None:
+            for player, settings in all_settings.items():
+                if not os.path.exists(_settings_path(player)):
+                    _write_settings_file(player, settings)
+            try:
+                os.replace(SETTINGS_FILE, SETTINGS_FILE + '.migrated')
+            except FileNotFoundError:
+                pass
+        _settings_migrated = True
+
 def load_settings(player):
-    if not os.path.exists(SETTINGS_FILE):
+    # Returns a copy so callers can't change the cached settings by accident
+    with _settings_lock:
+        if player in _settings_cache:
+            _settings_cache.move_to_end(player)
+            return dict(_settings_cache[player])
+    migrate_settings()
+    path = _settings_path(player)
+    if not os.path.exists(path):
         return None
-    with open(SETTINGS_FILE, 'r') as f:
+    with open(path, 'r') as f:
         try:
-            all_settings = json.load(f)
+            data = json.load(f)
         except json.JSONDecodeError:
-            all_settings = {}
-    return all_settings.get(player)
+            return None
+    settings = data.get('settings')
+    if not isinstance(settings, dict):
+        return None
+    # A save_settings() that ran while we were reading has already cached
+    # newer settings, so only fill the cache if the player isn't there yet
+    with _settings_lock:
+        settings = _settings_cache.setdefault(player, settings)
+        _settings_cache.move_to_end(player)
+        if len(_settings_cache) > SETTINGS_CACHE_SIZE:
+            _settings_cache.popitem(last=False)
+    return dict(settings)
 
 def save_settings(player, mode, difficulty):
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, 'r') as f:
-            try:
-                all_settings = json.load(f)
-            except json.JSONDecodeError:
-                all_settings = {}
-    else:
-        all_settings = {}
-    all_settings[player] = {'mode': mode, 'difficulty': difficulty}
-    with open(SETTINGS_FILE, 'w') as f:
-        json.dump(all_settings, f, indent=2)
+    migrate_settings()
+    settings = {'mode': mode, 'difficulty': difficulty}
+    _write_settings_file(player, settings)
+    _cache_settings(player, settings)
 
 def load_global_settings():
     if not os.path.exists(GLOBAL_SETTINGS_FILE):
@@ -349,6 +512,111 @@ def get_feedback(difference):
     else:
         return "💤 Missed! Keep trying!"
 
+@app.route('/api/scores', methods=['POST'])
+def api_scores():
+    # Batch score upload used by the terminal game (see score_sync.py).
+    # The whole batch is rejected with a 400 if any entry is invalid.
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('scores'), list):
+        return jsonify({'error': 'expected {"scores": [...]}'}), 400
+    entries = []
+    for item in data['scores']:
+        if not isinstance(item, dict):
+            return jsonify({'error': 'invalid score entry'}), 400
+        player = item.get('player')
+        score = item.get('score')
+        if not isinstance(player, str) or not player.strip():
+            return jsonify({'error': 'invalid player'}), 400
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not math.isfinite(score) or score < 0:
+            return jsonify({'error': 'invalid score'}), 400
+        if item.get('mode') not in VALID_MODES or item.get('difficulty') not in VALID_DIFFICULTIES:
+            return jsonify({'error': 'invalid mode or difficulty'}), 400
+        date = item.get('date')
+        entry = {
+            'player': player.strip()[:20],
+            'score': round(float(score), 3),
+            'difficulty': item['difficulty'],
+            'mode': item['mode'],
+            'date': date[:20] if isinstance(date, str) else datetime.now().strftime('%Y-%m-%d %H:%M')
+        }
+        if item.get('id'):
+            entry['id'] = str(item['id'])
+        entries.append(entry)
+    added = save_many_to_leaderboard(entries)
+    return jsonify({'received': len(entries), 'added': added})
+
+@app.route('/api/summary', methods=['GET'])
+def api_summary():
+    # Top-K summary for leaderboard_aggregator.py. Pass ?since=<version> to
+    # get a short "unchanged" answer when nothing new was played.
+    k = max(1, min(request.args.get('k', 10, type=int), SUMMARY_MAX_K))
+    since = request.args.get('since')
+    summary = get_summary()
+    if since == summary['version']:
+        return jsonify({'node': NODE_ID, 'version': summary['version'], 'changed': False})
+    return jsonify({
+        'node': NODE_ID,
+        'version': summary['version'],
+        'changed': True,
+        'runs': summary['runs'],
+        'runs_by_mode': summary['runs_by_mode'],
+        'top': summary['top'][:k]
+    })
+
+_analytics = None
+_analytics_lock = threading.Lock()
+
+@app.route('/api/analytics', methods=['GET'])
+def api_analytics():
+    # Score distribution, e.g. /api/analytics?mode=hidden&score=0.12
+    global _analytics
+    if not ANALYTICS_ENABLED:
+        return jsonify({'error': 'analytics needs score_analytics.py next to this file'}), 501
+    if not NUMPY_ENABLED:
+        return jsonify({'error': 'analytics needs numpy (pip install numpy)'}), 501
+    with _analytics_lock:
+        if _analytics is None:
+            _analytics = ScoreAnalytics(LEADERBOARD_FILE)
+    mode = request.args.get('mode') or None
+    difficulty = request.args.get('difficulty') or None
+    score = request.args.get('score', type=float)
+    if score is not None and not math.isfinite(score):
+        return jsonify({'error': 'score must be a finite number'}), 400
+    bins = max(1, min(request.args.get('bins', 20, type=int), 1000))
+    try:
+        return jsonify(_analytics.report(mode, difficulty, score, bins))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 500
+
+EXPORT_FIELDS = ['player', 'score', 'difficulty', 'mode', 'date']
+
+@app.route('/export.<fmt>', methods=['GET'])
+def export_leaderboard(fmt):
+    # Streams every run one row at a time, so big leaderboards are never held in memory
+    if not ANALYTICS_ENABLED:
+        return jsonify({'error': 'export needs score_analytics.py next to this file'}), 501
+    if fmt == 'csv':
+        def generate():
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(EXPORT_FIELDS)
+            for entry in iter_leaderboard(LEADERBOARD_FILE):
+                writer.writerow([entry.get(field) for field in EXPORT_FIELDS])
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            yield buf.getvalue()
+        mimetype = 'text/csv'
+    elif fmt == 'jsonl':
+        def generate():
+            for entry in iter_leaderboard(LEADERBOARD_FILE):
+                yield json.dumps({field: entry.get(field) for field in EXPORT_FIELDS}) + '\n'
+        mimetype = 'application/x-ndjson'
+    else:
+        return jsonify({'error': 'format must be csv or jsonl'}), 404
+    headers = {'Content-Disposition': f'attachment; filename=leaderboard.{fmt}'}
+    return Response(generate(), mimetype=mimetype, headers=headers)
+
 @app.route('/clear_result', methods=['POST'])
 def clear_result():
     session.pop('result', None)
@@ -372,4 +640,5 @@ def settings():
 
 if __name__ == '__main__':
     ensure_leaderboard_file()
-    app.run(debug=True)
+    migrate_settings()
+    app.run(debug=True, port=int(os.environ.get('COUNTDOWN_PORT', 5000)))
@@ -0,0 +1,102 @@
+#Builds one global leaderboard out of several web game nodes (game_countdown_web.py).
+#Each node serves a small top-K summary at /api/summary, this script pulls them and merges them.
+#Only the top K of every node is ever downloaded, so merging costs K x nodes no matter how many runs were played.
+#
+#Example with two nodes on one machine:
+#  COUNTDOWN_PORT=5001 COUNTDOWN_NODE_ID=a COUNTDOWN_LEADERBOARD=lb_a.json python game_countdown_web.py
+#  COUNTDOWN_PORT=5002 COUNTDOWN_NODE_ID=b COUNTDOWN_LEADERBOARD=lb_b.json python game_countdown_web.py
+#  python leaderboard_aggregator.py http://127.0.0.1:5001 http://127.0.0.1:5002
+
+import heapq
+import json
+import os
+import sys
+import time
+from itertools import islice
+from urllib.error import URLError
+from urllib.parse import quote
+from urllib.request import urlopen
+
+
+class LeaderboardAggregator:
+    def __init__(self, node_urls, top_k=10, output_file="global_leaderboard.json", timeout=3.0):
+        self.node_urls = [url.rstrip('/') for url in node_urls]
+        self.top_k = top_k
+        self.output_file = output_file
+        self.timeout = timeout
+        self.nodes = {}  # url -> last summary received from that node
+        self.leaderboard = []
+        self.total_runs = 0
+
+    def fetch_summary(self, url):
+        """Ask one node for its summary, sending the version we already have"""
+        query = f"/api/summary?k={self.top_k}"
+        if url in self.nodes:
+            query += "&since=" + quote(str(self.nodes[url]['version']))
+        with urlopen(url + query, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def poll(self):
+        """Pull every node and re-merge if any of them changed. Returns True if the global board changed."""
+        changed = False
+        for url in self.node_urls:
+            try:
+                summary = self.fetch_summary(url)
+            except (URLError, OSError, ValueError):
+                continue  # Node is down, keep its last known summary
+            if not summary.get('changed', True):
+                continue
+            for entry in summary['top']:
+                entry['node'] = summary['node']
+            self.nodes[url] = summary
+            changed = True
+        if changed:
+            self.merge()
+        return changed
+
+    def merge(self):
+        """k-way merge of the per-node top lists (each already sorted by score)"""
+        tops = [summary['top'] for summary in self.nodes.values()]
+        self.leaderboard = list(islice(heapq.merge(*tops, key=lambda x: x['score']), self.top_k))
+        self.total_runs = sum(summary['runs'] for summary in self.nodes.values())
+
+    def runs_by_mode(self):
+        """Total number of runs per mode over all nodes"""
+        totals = {}
+        for summary in self.nodes.values():
+            for mode, count in summary['runs_by_mode'].items():
+                totals[mode] = totals.get(mode, 0) + count
+        return totals
+
+    def save(self):
+        """Write the global leaderboard to the output file"""
+        data = {
+            'updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'total_runs': self.total_runs,
+            'runs_by_mode': self.runs_by_mode(),
+            'nodes': {url: summary['version'] for url, summary in self.nodes.items()},
+            'leaderboard': self.leaderboard
+        }
+        tmp_file = self.output_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_file, self.output_file)
+
+    def run(self, interval=5.0):
+        """Keep polling the nodes and saving the global leaderboard"""
+        while True:
+            if self.poll():
+                self.save()
+                print(f"Global leaderboard updated: {self.total_runs} runs from {len(self.nodes)} node(s)")
+            time.sleep(interval)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python leaderboard_aggregator.py <node_url> [<node_url> ...]")
+        sys.exit(1)
+    aggregator = LeaderboardAggregator(sys.argv[1:])
+    try:
+        aggregator.run()
+    except KeyboardInterrupt:
+        print("\nAggregator stopped")
@@ -0,0 +1,189 @@
+#Score statistics for the web version (game_countdown_web.py).
+#Scores are loaded into NumPy arrays, one per mode/difficulty, so percentiles, histograms
+#and feedback counts are computed in one go instead of looping over Python dicts.
+#Needs NumPy: pip install numpy
+
+import json
+import os
+import threading
+from array import array
+
+try:
+    import numpy as np
+    NUMPY_ENABLED = True
+except ImportError:
+    NUMPY_ENABLED = False
+
+# Same limits as get_feedback() in game_countdown_web.py, a diff equal to a limit
+# still counts for that tier
+FEEDBACK_THRESHOLDS = (0.05, 0.1, 0.2, 0.3, 0.5)
+FEEDBACK_TIERS = ('perfect', 'excellent', 'great', 'good', 'not_bad', 'missed')
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90, 99)
+MAX_ENTRY_SIZE = 1024 * 1024  # No real entry comes close, bigger means the file is broken
+
+
+def iter_leaderboard(path, chunk_size=65536):
+    """Yield leaderboard entries one by one without loading the whole JSON file.
+    Raises ValueError if the file is malformed."""
+    if not os.path.exists(path):
+        return
+    decoder = json.JSONDecoder()
+    buf = ''
+    with open(path, 'r') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            buf += chunk
+            pos = 0
+            while True:
+                # Skip the list brackets, commas and whitespace between entries
+                while pos < len(buf) and buf[pos] in ' \t\r\n,[':
+                    pos += 1
+                if pos >= len(buf) or buf[pos] == ']':
+                    break
+                try:
+                    entry, pos = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    break  # Entry continues in the next chunk
+                yield entry
+            buf = buf[pos:]
+            if buf.startswith(']'):
+                return
+            if not chunk:
+                if buf.strip():
+                    raise ValueError(f"Malformed leaderboard entry in {path}: {buf[:50]!r}")
+                return
+            if len(buf) > MAX_ENTRY_SIZE:
+                raise ValueError(f"Malformed leaderboard entry in {path}: {buf[:50]!r}")
+
+
+class ScoreAnalytics:
+    def __init__(self, leaderboard_file):
+        if not NUMPY_ENABLED:
+            raise RuntimeError("Score analytics needs NumPy, install it with: pip install numpy")
+        self.leaderboard_file = leaderboard_file
+        # (file key, groups, results). groups maps (mode, difficulty) to a sorted
+        # float64 array of scores, results holds cached answers for that file
+        # version. The tuple is replaced as a whole when the file changes, so a
+        # request that already took a snapshot keeps working with it.
+        self.state = (None, {}, {})
+        self.lock = threading.Lock()  # Only one thread reloads the file at a time
+
+    def refresh(self):
+        """Reload the scores if the leaderboard file changed, and return the current state"""
+        if os.path.exists(self.leaderboard_file):
+            stat = os.stat(self.leaderboard_file)
+            key = (stat.st_mtime_ns, stat.st_size)
+        else:
+            key = None
+        if key == self.state[0]:
+            return self.state
+        with self.lock:
+            if key == self.state[0]:
+                return self.state  # Another thread just loaded it
+            columns = {}
+            for entry in iter_leaderboard(self.leaderboard_file):
+                try:
+                    score = float(entry['score'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                group = (entry.get('mode'), entry.get('difficulty'))
+                columns.setdefault(group, array('d')).append(score)
+            groups = {group: np.sort(np.frombuffer(scores, dtype=np.float64)) for group, scores in columns.items()}
+            self.state = (key, groups, {})
+            return self.state
+
+    def _scores(self, state, mode, difficulty):
+        _, groups, results = state
+        cache_key = ('scores', mode, difficulty)
+        scores = results.get(cache_key)
+        if scores is None:
+            parts = [scores for (group_mode, group_difficulty), scores in groups.items()
+                     if (mode is None or group_mode == mode) and (difficulty is None or group_difficulty == difficulty)]
+            if len(parts) == 1:
+                scores = parts[0]
+            elif parts:
+                scores = np.sort(np.concatenate(parts))
+            else:
+                scores = np.empty(0, dtype=np.float64)
+            results[cache_key] = scores
+        return scores
+
+    def scores(self, mode=None, difficulty=None):
+        """Sorted scores for one mode/difficulty (None means any)"""
+        return self._scores(self.refresh(), mode, difficulty)
+
+    def percentile_of(self, score, mode=None, difficulty=None):
+        """Percent of runs with a diff of at most `score` (lower diffs are better)"""
+        return self._percentile_of(self.refresh(), score, mode, difficulty)
+
+    def _percentile_of(self, state, score, mode, difficulty):
+        scores = self._scores(state, mode, difficulty)
+        if not len(scores):
+            return None
+        return float(100.0 * np.searchsorted(scores, score, side='right') / len(scores))
+
+    def percentiles(self, mode=None, difficulty=None, percents=DEFAULT_PERCENTILES):
+        """Score at each of the given percentiles"""
+        return self._percentiles(self.refresh(), mode, difficulty, percents)
+
+    def _percentiles(self, state, mode, difficulty, percents):
+        results = state[2]
+        cache_key = ('percentiles', mode, difficulty, tuple(percents))
+        value = results.get(cache_key)
+        if value is None:
+            scores = self._scores(state, mode, difficulty)
+            values = np.percentile(scores, percents) if len(scores) else [None] * len(percents)
+            value = {str(p): (None if v is None else float(v)) for p, v in zip(percents, values)}
+            results[cache_key] = value
+        return value
+
+    def histogram(self, mode=None, difficulty=None, bins=20, max_score=None):
+        """Counts per bin, from 0 up to max_score (or the worst score)"""
+        return self._histogram(self.refresh(), mode, difficulty, bins, max_score)
+
+    def _histogram(self, state, mode, difficulty, bins, max_score):
+        results = state[2]
+        cache_key = ('histogram', mode, difficulty, bins, max_score)
+        value = results.get(cache_key)
+        if value is None:
+            scores = self._scores(state, mode, difficulty)
+            if len(scores):
+                upper = max_score if max_score is not None else float(scores[-1])
+                counts, edges = np.histogram(scores, bins=bins, range=(0.0, max(upper, 1e-9)))
+            else:
+                counts, edges = np.zeros(bins, dtype=np.int64), np.zeros(bins + 1)
+            value = {'counts': counts.tolist(), 'edges': edges.tolist()}
+            results[cache_key] = value
+        return value
+
+    def feedback_counts(self, mode=None, difficulty=None):
+        """Number of runs in each get_feedback() tier"""
+        return self._feedback_counts(self.refresh(), mode, difficulty)
+
+    def _feedback_counts(self, state, mode, difficulty):
+        results = state[2]
+        cache_key = ('feedback', mode, difficulty)
+        value = results.get(cache_key)
+        if value is None:
+            scores = self._scores(state, mode, difficulty)
+            tiers = np.searchsorted(FEEDBACK_THRESHOLDS, scores, side='left')
+            counts = np.bincount(tiers, minlength=len(FEEDBACK_TIERS))
+            value = dict(zip(FEEDBACK_TIERS, counts.tolist()))
+            results[cache_key] = value
+        return value
+
+    def report(self, mode=None, difficulty=None, score=None, bins=20):
+        """Everything above in one dict, ready for jsonify. All parts come from the same file version."""
+        state = self.refresh()
+        data = {
+            'mode': mode,
+            'difficulty': difficulty,
+            'runs': int(len(self._scores(state, mode, difficulty))),
+            'percentiles': self._percentiles(state, mode, difficulty, DEFAULT_PERCENTILES),
+            'histogram': self._histogram(state, mode, difficulty, bins, None),
+            'feedback': self._feedback_counts(state, mode, difficulty)
+        }
+        if score is not None:
+            data['score'] = score
+            data['percentile_of_score'] = self._percentile_of(state, score, mode, difficulty)
+        return data
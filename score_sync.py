@@ -0,0 +1,181 @@
+#Sends scores from the terminal game (game_countdown.py) to the web version (game_countdown_web.py)
+#so both leaderboards end up in the same leaderboard.json.
+#Scores are first written to a local queue file, then sent in batches from a background thread,
+#so the game never waits on the network. The HTTP connection is reused between batches
+#when the server keeps it open (Flask's built-in server closes it after every reply).
+#If the server can't be reached the scores just stay in the queue and get sent next time.
+#Scores the server refuses as invalid (400) are moved to a separate file so they don't block the rest.
+
+import http.client
+import json
+import os
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+
+class ScoreSync:
+    def __init__(self, server_url, queue_file="score_queue.jsonl", batch_size=50, retry_delay=5.0, timeout=3.0):
+        parts = urlsplit(server_url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.https = parts.scheme == "https"
+        self.path = parts.path.rstrip('/') + "/api/scores"
+        self.queue_file = queue_file
+        self.rejected_file = os.path.splitext(queue_file)[0] + ".rejected.jsonl"
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay  # Seconds to wait before trying again after a failure
+        self.timeout = timeout
+        self.conn = None
+        self.next_attempt = 0
+        self.queue_lock = threading.Lock()  # Guards the queue file between the game and the sender
+        self.flush_lock = threading.Lock()  # Only one flush at a time
+        self.thread = None
+
+    def _connect(self):
+        """Open the shared connection if there isn't one yet"""
+        if self.conn is None:
+            if self.https:
+                self.conn = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+            else:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return self.conn
+
+    def _close_connection(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def close(self, timeout=1.0):
+        """Give a running background send a moment to finish, then close the connection"""
+        if self.thread is not None:
+            self.thread.join(timeout)
+        if self.thread is None or not self.thread.is_alive():
+            self._close_connection()
+
+    def _post(self, entries):
+        """POST one batch and return the HTTP status, reconnecting once if a reused socket went stale"""
+        body = json.dumps({'scores': entries})
+        headers = {'Content-Type': 'application/json'}
+        for attempt in range(2):
+            reused = self.conn is not None
+            conn = self._connect()
+            try:
+                conn.request("POST", self.path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()  # Must drain the body before the socket can be reused
+                if response.will_close:
+                    self._close_connection()
+                return response.status
+            except (http.client.HTTPException, OSError):
+                self._close_connection()
+                if attempt == 1 or not reused:
+                    raise
+
+    def enqueue(self, player, score, difficulty, mode, date):
+        """Write one score to the queue file"""
+        entry = {
+            'id': uuid.uuid4().hex,  # Lets the server ignore a batch it already stored
+            'player': player,
+            'score': round(score, 3),
+            'difficulty': difficulty,
+            'mode': mode,
+            'date': date
+        }
+        with self.queue_lock:
+            with open(self.queue_file, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def submit(self, player, score, difficulty, mode, date):
+        """Queue one score and send the queue in the background"""
+        self.enqueue(player, score, difficulty, mode, date)
+        self.flush_in_background()
+
+    def flush_in_background(self):
+        """Start a background flush unless one is running or we're waiting to retry"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        if time.time() < self.next_attempt:
+            return
+        self.thread = threading.Thread(target=self.flush, daemon=True)
+        self.thread.start()
+
+    def pending(self):
+        """Return all scores still waiting in the queue file"""
+        with self.queue_lock:
+            return self._read_queue()
+
+    def _read_queue(self):
+        if not os.path.exists(self.queue_file):
+            return []
+        entries = []
+        with open(self.queue_file, 'r') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # Half-written line from a crash
+        return entries
+
+    def _drop_from_queue(self, count):
+        """Remove the first `count` entries. New scores are only ever appended, so those are the ones we handled."""
+        with self.queue_lock:
+            remaining = self._read_queue()[count:]
+            tmp_file = self.queue_file + ".tmp"
+            with open(tmp_file, 'w') as f:
+                for entry in remaining:
+                    f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.queue_file)
+
+    def _reject(self, entries):
+        """Keep refused scores in a separate file for a human to look at"""
+        with open(self.rejected_file, 'a') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+
+    def flush(self, force=False):
+        """Send queued scores in batches. Returns the number the server accepted."""
+        if not force and time.time() < self.next_attempt:
+            return 0
+        if not self.flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            entries = self.pending()
+            handled = 0
+            sent = 0
+            size = self.batch_size
+            narrow_until = 0
+            while handled < len(entries):
+                if handled >= narrow_until:
+                    size = self.batch_size
+                batch = entries[handled:handled + size]
+                try:
+                    status = self._post(batch)
+                except (http.client.HTTPException, OSError):
+                    status = None
+                if status == 400:
+                    # The server said a score is invalid. Other 4xx (wrong URL, size
+                    # limit, rate limit) say nothing about the scores, so those are
+                    # retried later like a 5xx
+                    if len(batch) > 1:
+                        # Resend this batch one score at a time to find the bad ones
+                        size = 1
+                        narrow_until = handled + len(batch)
+                        continue
+                    self._reject(batch)  # Retrying won't help, move it out of the way
+                elif status is None or not 200 <= status < 300:
+                    self.next_attempt = time.time() + self.retry_delay
+                    break
+                else:
+                    sent += len(batch)
+                handled += len(batch)
+            if handled:
+                self._drop_from_queue(handled)
+            return sent
+        finally:
+            self.flush_lock.release()
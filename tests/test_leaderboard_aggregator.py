@@ -0,0 +1,74 @@
+#Tests leaderboard_aggregator.py against two game_countdown_web.py nodes running as separate processes.
+
+import json
+import os
+import tempfile
+import unittest
+
+from test_score_sync import FLASK_ENABLED, WebServer, free_port
+
+from leaderboard_aggregator import LeaderboardAggregator
+
+
+def entry(player, score):
+    return {"player": player, "score": score, "difficulty": "easy", "mode": "hidden", "date": "2025-01-01 12:00"}
+
+
+@unittest.skipUnless(FLASK_ENABLED, "Flask is not installed")
+class LeaderboardAggregatorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.nodes = []
+        for name, scores in (("a", [0.3, 0.1, 0.7]), ("b", [0.2, 0.05, 0.9, 0.4])):
+            work_dir = os.path.join(self.tmp.name, name)
+            os.mkdir(work_dir)
+            node = WebServer(work_dir, free_port(), node_id=name)
+            with open(node.leaderboard_file, "w") as f:
+                json.dump([entry(name, score) for score in scores], f)
+            node.start()
+            self.nodes.append(node)
+        self.aggregator = LeaderboardAggregator([f"http://127.0.0.1:{node.port}" for node in self.nodes], top_k=3,
+                                                output_file=os.path.join(self.tmp.name, "global.json"))
+
+    def tearDown(self):
+        for node in self.nodes:
+            node.stop()
+        self.tmp.cleanup()
+
+    def ranking(self):
+        return [(e["node"], e["score"]) for e in self.aggregator.leaderboard]
+
+    def test_merges_top_k_from_every_node(self):
+        self.assertTrue(self.aggregator.poll())
+        self.assertEqual(self.ranking(), [("b", 0.05), ("a", 0.1), ("b", 0.2)])
+        self.assertEqual(self.aggregator.total_runs, 7)
+        self.assertEqual(self.aggregator.runs_by_mode(), {"hidden": 7})
+
+        self.aggregator.save()
+        with open(self.aggregator.output_file, "r") as f:
+            saved = json.load(f)
+        self.assertEqual(saved["total_runs"], 7)
+        self.assertEqual(len(saved["leaderboard"]), 3)
+
+    def test_second_poll_without_changes_is_a_no_op(self):
+        self.assertTrue(self.aggregator.poll())
+        self.assertFalse(self.aggregator.poll())
+
+    def test_new_score_on_one_node_is_merged(self):
+        self.aggregator.poll()
+        body = json.dumps({"scores": [{"player": "a", "score": 0.01, "difficulty": "easy", "mode": "hidden"}]})
+        self.assertEqual(self.nodes[0].post(body)[0], 200)
+        self.assertTrue(self.aggregator.poll())
+        self.assertEqual(self.ranking(), [("a", 0.01), ("b", 0.05), ("a", 0.1)])
+        self.assertEqual(self.aggregator.total_runs, 8)
+
+    def test_down_node_keeps_its_last_summary(self):
+        self.aggregator.poll()
+        self.nodes[0].stop()
+        self.assertFalse(self.aggregator.poll())
+        self.assertEqual(self.ranking(), [("b", 0.05), ("a", 0.1), ("b", 0.2)])
+        self.assertEqual(self.aggregator.total_runs, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+#Tests for score_analytics.py and the analytics/export routes in game_countdown_web.py.
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from score_analytics import FEEDBACK_THRESHOLDS, FEEDBACK_TIERS, NUMPY_ENABLED, ScoreAnalytics, iter_leaderboard
+
+try:
+    import game_countdown_web
+    FLASK_ENABLED = True
+except ImportError:
+    FLASK_ENABLED = False
+
+
+def entry(score, mode="hidden", player="p"):
+    return {"player": player, "score": score, "difficulty": None, "mode": mode, "date": "2025-01-01 12:00"}
+
+
+class LeaderboardFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "leaderboard.json")
+
+    def write(self, text):
+        with open(self.path, "w") as f:
+            f.write(text)
+
+
+class IterLeaderboardTest(LeaderboardFileTest):
+    def test_every_chunk_size_reads_the_same_entries(self):
+        entries = [entry(i / 7, player=f"player {i} with, [brackets] and \"quotes\"") for i in range(25)]
+        for indent in (None, 2):
+            self.write(json.dumps(entries, indent=indent))
+            for chunk_size in (1, 2, 3, 7, 16, 64, 65536):
+                self.assertEqual(list(iter_leaderboard(self.path, chunk_size)), entries, (indent, chunk_size))
+
+    def test_empty_and_missing_files(self):
+        self.assertEqual(list(iter_leaderboard(self.path)), [])
+        for text in ("[]", "[\n]", "", "  "):
+            self.write(text)
+            self.assertEqual(list(iter_leaderboard(self.path, 1)), [], repr(text))
+
+    def test_malformed_entry_raises(self):
+        self.write('[{"score": 1}, {"score": oops}, {"score": 2}]')
+        for chunk_size in (1, 4, 65536):
+            seen = []
+            with self.assertRaises(ValueError):
+                for item in iter_leaderboard(self.path, chunk_size):
+                    seen.append(item)
+            self.assertEqual(seen, [{"score": 1}])
+
+    def test_truncated_file_raises(self):
+        self.write('[{"score": 1}, {"score": 2')
+        with self.assertRaises(ValueError):
+            list(iter_leaderboard(self.path, 3))
+
+
+@unittest.skipUnless(NUMPY_ENABLED, "NumPy is not installed")
+class ScoreAnalyticsTest(LeaderboardFileTest):
+    def test_feedback_tiers_match_exact_limits(self):
+        # A diff equal to a limit belongs to the better tier, just above it to the next one
+        scores = [0.0]
+        for limit in FEEDBACK_THRESHOLDS:
+            scores += [limit, limit + 0.001]
+        self.write(json.dumps([entry(score) for score in scores]))
+        counts = ScoreAnalytics(self.path).feedback_counts()
+        self.assertEqual(counts, {"perfect": 2, "excellent": 2, "great": 2, "good": 2, "not_bad": 2, "missed": 1})
+        self.assertEqual(list(counts), list(FEEDBACK_TIERS))
+
+    @unittest.skipUnless(FLASK_ENABLED, "Flask is not installed")
+    def test_feedback_tiers_agree_with_get_feedback(self):
+        scores = [0.0, 0.049, 0.05, 0.051, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35, 0.5, 0.501, 3.0]
+        self.write(json.dumps([entry(score) for score in scores]))
+        expected = {}
+        messages = {}
+        for score in scores:
+            message = game_countdown_web.get_feedback(score)
+            if message not in messages:
+                messages[message] = FEEDBACK_TIERS[len(messages)]  # Scores are sorted, so tiers appear in order
+            tier = messages[message]
+            expected[tier] = expected.get(tier, 0) + 1
+        counts = ScoreAnalytics(self.path).feedback_counts()
+        self.assertEqual({tier: n for tier, n in counts.items() if n}, expected)
+
+    def test_percentiles_and_cache_refresh(self):
+        self.write(json.dumps([entry(s / 10) for s in range(1, 11)] + [entry(5.0, mode="visible")]))
+        analytics = ScoreAnalytics(self.path)
+        self.assertEqual(analytics.percentile_of(0.5, mode="hidden"), 50.0)
+        self.assertEqual(len(analytics.scores()), 11)
+        self.assertEqual(analytics.report(mode="visible")["runs"], 1)
+
+        self.write(json.dumps([entry(0.1)]))
+        os.utime(self.path, ns=(0, 0))  # Make sure the file key changes even on coarse clocks
+        self.assertEqual(len(analytics.scores()), 1)
+
+
+@unittest.skipUnless(FLASK_ENABLED, "Flask is not installed")
+class WebRoutesTest(LeaderboardFileTest):
+    def setUp(self):
+        super().setUp()
+        self.old_file = game_countdown_web.LEADERBOARD_FILE
+        game_countdown_web.LEADERBOARD_FILE = self.path
+        game_countdown_web._analytics = None
+        self.addCleanup(setattr, game_countdown_web, "LEADERBOARD_FILE", self.old_file)
+        self.addCleanup(setattr, game_countdown_web, "_analytics", None)
+        self.client = game_countdown_web.app.test_client()
+
+    @unittest.skipUnless(NUMPY_ENABLED, "NumPy is not installed")
+    def test_analytics_rejects_non_finite_score(self):
+        self.write(json.dumps([entry(0.1)]))
+        for value in ("nan", "inf", "-inf"):
+            self.assertEqual(self.client.get(f"/api/analytics?score={value}").status_code, 400, value)
+        self.assertEqual(self.client.get("/api/analytics?score=0.1").status_code, 200)
+
+    def test_export_keeps_reading_the_file_it_started_with(self):
+        old = [entry(i / 100, player="old") for i in range(50)]
+        self.write(json.dumps(old, indent=2))
+        rows = iter_leaderboard(self.path, chunk_size=16)
+        first = [next(rows) for _ in range(5)]
+        game_countdown_web.save_many_to_leaderboard([entry(0.001, player="new")])
+        self.assertEqual(first + list(rows), old)
+
+    def test_export_streams_csv_and_jsonl(self):
+        self.write(json.dumps([entry(0.1, player="a"), entry(0.2, player="b")]))
+        csv_rows = self.client.get("/export.csv").get_data(as_text=True).splitlines()
+        self.assertEqual(csv_rows[0], "player,score,difficulty,mode,date")
+        self.assertEqual(len(csv_rows), 3)
+        jsonl_rows = self.client.get("/export.jsonl").get_data(as_text=True).splitlines()
+        self.assertEqual([json.loads(row)["player"] for row in jsonl_rows], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
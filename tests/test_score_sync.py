@@ -0,0 +1,240 @@
+#End-to-end tests for score_sync.py against a real game_countdown_web.py server started in a subprocess.
+#Run from the repo folder: python -m pytest -q   (or: python -m unittest discover tests)
+
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from score_sync import ScoreSync
+
+try:
+    import flask  # noqa: F401  (only needed by the server subprocess)
+    FLASK_ENABLED = True
+except ImportError:
+    FLASK_ENABLED = False
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class WebServer:
+    """game_countdown_web.app running in its own process"""
+
+    def __init__(self, work_dir, port, node_id=None):
+        self.work_dir = work_dir
+        self.port = port
+        self.node_id = node_id
+        self.process = None
+        self.leaderboard_file = os.path.join(work_dir, "leaderboard.json")
+
+    def start(self):
+        env = dict(os.environ, PYTHONPATH=REPO_DIR, COUNTDOWN_LEADERBOARD=self.leaderboard_file)
+        if self.node_id:
+            env["COUNTDOWN_NODE_ID"] = self.node_id
+        code = f"import game_countdown_web as w; w.app.run(port={self.port})"
+        self.process = subprocess.Popen([sys.executable, "-c", code], cwd=self.work_dir, env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 15
+        while time.time() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.2).close()
+                return
+            except OSError:
+                time.sleep(0.05)
+        self.stop()
+        raise RuntimeError("Web server did not start")
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+            self.process = None
+
+    def leaderboard(self):
+        if not os.path.exists(self.leaderboard_file):
+            return []
+        with open(self.leaderboard_file, "r") as f:
+            return json.load(f)
+
+    def post(self, body):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            conn.request("POST", "/api/scores", body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+
+@unittest.skipUnless(FLASK_ENABLED, "Flask is not installed")
+class ScoreSyncEndToEndTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = WebServer(self.tmp.name, free_port())
+        self.url = f"http://127.0.0.1:{self.server.port}"
+        self.queue_file = os.path.join(self.tmp.name, "score_queue.jsonl")
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def make_sync(self, **kwargs):
+        sync = ScoreSync(self.url, queue_file=self.queue_file, retry_delay=0, timeout=2.0, **kwargs)
+        self.addCleanup(sync.close)
+        return sync
+
+    def queue_scores(self, sync, player, count):
+        for i in range(count):
+            sync.enqueue(player, i / 100, "easy", "hidden", "2025-01-01 12:00")
+
+    def test_offline_scores_stay_queued(self):
+        sync = self.make_sync()
+        self.queue_scores(sync, "offline", 5)
+        self.assertEqual(sync.flush(force=True), 0)
+        self.assertEqual(len(sync.pending()), 5)
+
+    def test_queue_is_replayed_after_server_restart(self):
+        sync = self.make_sync()
+        self.server.start()
+        self.queue_scores(sync, "before", 3)
+        self.assertEqual(sync.flush(force=True), 3)
+
+        self.server.stop()
+        self.queue_scores(sync, "during", 4)
+        self.assertEqual(sync.flush(force=True), 0)
+        self.assertEqual(len(sync.pending()), 4)
+
+        self.server.start()
+        self.assertEqual(sync.flush(force=True), 4)
+        self.assertEqual(sync.pending(), [])
+        players = [entry["player"] for entry in self.server.leaderboard()]
+        self.assertEqual(players.count("before"), 3)
+        self.assertEqual(players.count("during"), 4)
+
+    def test_resent_batch_is_not_stored_twice(self):
+        self.server.start()
+        body = json.dumps({"scores": [{"id": "abc", "player": "dup", "score": 0.5,
+                                       "difficulty": "easy", "mode": "hidden"}]})
+        self.assertEqual(self.server.post(body)[0], 200)
+        self.assertEqual(self.server.post(body)[0], 200)
+        self.assertEqual([e["player"] for e in self.server.leaderboard()].count("dup"), 1)
+
+    def test_invalid_scores_are_rejected(self):
+        self.server.start()
+        bad_bodies = [
+            '{"scores": [{"player": "x", "score": NaN, "difficulty": "easy", "mode": "hidden"}]}',
+            '{"scores": [{"player": "x", "score": Infinity, "difficulty": "easy", "mode": "hidden"}]}',
+            '{"scores": [{"player": "x", "score": -5.0, "difficulty": "easy", "mode": "hidden"}]}',
+            '{"scores": [{"player": "x", "score": "0.1", "difficulty": "easy", "mode": "hidden"}]}',
+            '{"scores": [{"player": "x", "score": 0.1, "difficulty": null, "mode": "hidden"}]}',
+            '{"scores": [{"player": "x", "score": 0.1, "difficulty": "easy", "mode": "other"}]}',
+            '{"scores": [1]}',
+            '[1]',
+        ]
+        for body in bad_bodies:
+            self.assertEqual(self.server.post(body)[0], 400, body)
+        self.assertEqual(self.server.leaderboard(), [])
+
+    def test_rejected_score_does_not_block_the_queue(self):
+        sync = self.make_sync()
+        self.server.start()
+        self.queue_scores(sync, "good", 2)
+        with open(self.queue_file, "a") as f:
+            f.write(json.dumps({"id": "bad", "player": "bad", "score": "abc",
+                                "difficulty": "easy", "mode": "hidden"}) + "\n")
+        self.queue_scores(sync, "good", 2)
+
+        self.assertEqual(sync.flush(force=True), 4)
+        self.assertEqual(sync.pending(), [])
+        with open(sync.rejected_file, "r") as f:
+            self.assertEqual([json.loads(line)["id"] for line in f], ["bad"])
+
+    def test_concurrent_uploads_keep_every_score(self):
+        self.server.start()
+
+        def upload(thread):
+            for i in range(40):
+                body = json.dumps({"scores": [{"id": f"{thread}-{i}", "player": "many", "score": i / 100,
+                                               "difficulty": "easy", "mode": "hidden"}]})
+                self.assertEqual(self.server.post(body)[0], 200)
+
+        threads = [threading.Thread(target=upload, args=(t,)) for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.server.leaderboard()), 160)
+
+    def test_wrong_server_path_keeps_the_queue(self):
+        self.server.start()
+        sync = ScoreSync(self.url + "/wrong", queue_file=self.queue_file, retry_delay=0, timeout=2.0)
+        self.addCleanup(sync.close)
+        self.queue_scores(sync, "lost", 3)
+        self.assertEqual(sync.flush(force=True), 0)
+        self.assertEqual(len(sync.pending()), 3)
+        self.assertFalse(os.path.exists(sync.rejected_file))
+
+    def test_game_sends_leftover_scores_at_startup(self):
+        import game_countdown
+        old_dir = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, old_dir)
+        self.queue_scores(self.make_sync(), "leftover", 3)  # Queued in an earlier session
+        self.server.start()
+
+        old_url = game_countdown.SERVER_URL
+        game_countdown.SERVER_URL = self.url
+        self.addCleanup(setattr, game_countdown, "SERVER_URL", old_url)
+        game = game_countdown.TimerGame()
+        game.sync.close(timeout=5.0)
+        self.assertEqual(game.sync.pending(), [])
+        self.assertEqual([e["player"] for e in self.server.leaderboard()].count("leftover"), 3)
+
+    def test_submit_does_not_wait_for_a_stuck_server(self):
+        # A socket that accepts connections but never answers
+        with socket.socket() as stuck:
+            stuck.bind(("127.0.0.1", 0))
+            stuck.listen(1)
+            sync = ScoreSync(f"http://127.0.0.1:{stuck.getsockname()[1]}", queue_file=self.queue_file, timeout=1.0)
+            started = time.perf_counter()
+            sync.submit("stuck", 0.1, "easy", "hidden", "2025-01-01 12:00")
+            self.assertLess(time.perf_counter() - started, 0.5)
+            sync.close(timeout=3.0)
+        self.assertEqual(len(sync.pending()), 1)
+
+    def test_submission_rate(self):
+        sync = self.make_sync()
+        self.server.start()
+        count = 500
+        self.queue_scores(sync, "bulk", count)
+        started = time.perf_counter()
+        self.assertEqual(sync.flush(force=True), count)
+        bulk_rate = count / (time.perf_counter() - started)
+
+        count = 50
+        started = time.perf_counter()
+        for i in range(count):
+            sync.enqueue("single", i / 100, "easy", "hidden", "2025-01-01 12:00")
+            self.assertEqual(sync.flush(force=True), 1)
+        single_rate = count / (time.perf_counter() - started)
+
+        print(f"\nScore sync: {bulk_rate:.0f} scores/s replaying the queue in batches, "
+              f"{single_rate:.0f} scores/s sending one at a time")
+        self.assertGreater(bulk_rate, single_rate)
+
+
+if __name__ == "__main__":
+    unittest.main()